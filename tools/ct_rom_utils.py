@@ -7,6 +7,7 @@ Designed for AI-assisted ROM hacking workflows.
 
 Usage:
     python3 tools/ct_rom_utils.py info base.smc
+    python3 tools/ct_rom_utils.py info base.smc --json --no-hashes
     python3 tools/ct_rom_utils.py header base.smc
     python3 tools/ct_rom_utils.py checksum base.smc
     python3 tools/ct_rom_utils.py extract-text base.smc --offset 0x1EF000 --length 0x1000
@@ -16,10 +17,18 @@ Usage:
 
 import sys
 import os
+import mmap
 import hashlib
+import itertools
+import json
 import struct
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
 
 
 # =============================================================================
@@ -31,11 +40,19 @@ HIROM_HEADER_OFFSET = 0xFFB0
 # Known Chrono Trigger ROM hashes (unheadered US v1.0)
 CT_KNOWN_HASHES = {
     "md5": "a2bc447961e52fd2227baed164f729dc",
-    "sha1": "a10e3d8a1b3e2d0d90e2e1f3c4b5a6d7e8f9a0b1",  # placeholder
 }
 
+# One row of SNESRom.compare() output
+DIFF_DTYPE = np.dtype([("offset", "u4"), ("original", "u1"), ("modified", "u1")])
+
+# Bytes scanned per step by SNESRom.iter_diffs()
+DIFF_BLOCK_SIZE = 0x10000
+
+# Hexdump ASCII column: byte -> itself if printable, else "."
+_ASCII_TABLE = bytes((b if 32 <= b < 127 else 0x2E) for b in range(256))
+
 # CT-specific memory map (LoROM)
-CT_DATA_OFFSETS = {
+CT_DATA_OFFSETS = MappingProxyType({
     "dialogue_pointers": 0x1EF000,
     "item_data": 0x0C0000,
     "enemy_data": 0x0C5000,
@@ -43,7 +60,8 @@ CT_DATA_OFFSETS = {
     "character_stats": 0x0C2500,
     "shop_data": 0x0C0E00,
     "location_names": 0x06F200,
-}
+})
+_CT_OFFSETS_SORTED = tuple(sorted(CT_DATA_OFFSETS.items()))
 
 
 class SNESRom:
@@ -51,10 +69,66 @@ class SNESRom:
 
     def __init__(self, filepath: str):
         self.filepath = Path(filepath)
-        self.data = self.filepath.read_bytes()
+        self._mmap = None
+        self._hashes = {}
+        fd = os.open(self.filepath, os.O_RDONLY)
+        try:
+            # mmap refuses zero-length files; fall back to an empty buffer
+            if os.fstat(fd).st_size:
+                self._mmap = mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        self._open_views()
+
+    def _open_views(self) -> None:
+        """(Re)create the data/rom_data views over the mapping."""
+        self.data = memoryview(self._mmap if self._mmap is not None else b"")
         self.has_header = self._detect_header()
         self.rom_data = self.data[512:] if self.has_header else self.data
 
+    def __enter__(self) -> "SNESRom":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass  # a caller still holds a view; the mapping is freed with it
+
+    def close(self) -> None:
+        """Release the ROM mapping.
+
+        Raises BufferError if something else (e.g. a NumPy array over
+        rom_data) still references the mapping. The ROM is then left open
+        and fully usable, and close() can be retried once that reference
+        is dropped.
+        """
+        mm = getattr(self, "_mmap", None)
+        if mm is None:
+            return
+        try:
+            self.rom_data.release()
+            self.data.release()
+            mm.close()
+        except BufferError:
+            self._open_views()
+            raise
+        self._mmap = None
+
+    def _madvise(self, advice: str) -> None:
+        """Hint the kernel about access to the whole mapping (no-op if unsupported)."""
+        flag = getattr(mmap, advice, None)
+        if self._mmap is None or flag is None:
+            return
+        self._mmap.madvise(flag)
+
+    def prefetch(self) -> None:
+        """Start async readahead of the whole ROM, for commands that scan all of it."""
+        self._madvise("MADV_WILLNEED")
+
     def _detect_header(self) -> bool:
         """Detect if ROM has a 512-byte copier header."""
         size = len(self.data)
@@ -64,22 +138,20 @@ class SNESRom:
     def size(self) -> int:
         return len(self.rom_data)
 
-    @property
+    @cached_property
     def mapping_mode(self) -> str:
         """Detect LoROM vs HiROM."""
-        # Check LoROM header location
-        if self.size > LOROM_HEADER_OFFSET + 0x30:
-            lo_checksum = struct.unpack_from("<H", self.rom_data, LOROM_HEADER_OFFSET + 0x1C)[0]
-            lo_complement = struct.unpack_from("<H", self.rom_data, LOROM_HEADER_OFFSET + 0x1E)[0]
-            if (lo_checksum ^ lo_complement) == 0xFFFF:
-                return "LoROM"
-
+        # Check HiROM header location first (CT is HiROM)
         if self.size > HIROM_HEADER_OFFSET + 0x30:
-            hi_checksum = struct.unpack_from("<H", self.rom_data, HIROM_HEADER_OFFSET + 0x1C)[0]
-            hi_complement = struct.unpack_from("<H", self.rom_data, HIROM_HEADER_OFFSET + 0x1E)[0]
+            hi_checksum, hi_complement = struct.unpack_from("<HH", self.rom_data, HIROM_HEADER_OFFSET + 0x1C)
             if (hi_checksum ^ hi_complement) == 0xFFFF:
                 return "HiROM"
 
+        if self.size > LOROM_HEADER_OFFSET + 0x30:
+            lo_checksum, lo_complement = struct.unpack_from("<HH", self.rom_data, LOROM_HEADER_OFFSET + 0x1C)
+            if (lo_checksum ^ lo_complement) == 0xFFFF:
+                return "LoROM"
+
         return "Unknown"
 
     def get_header_offset(self) -> int:
@@ -91,86 +163,150 @@ class SNESRom:
 
     def read_internal_header(self) -> dict:
         """Read SNES internal ROM header."""
+        return dict(self._internal_header)
+
+    @cached_property
+    def _internal_header(self) -> dict:
+        """Internal header, parsed once (ROM data never changes after mapping)."""
         # CT is HiROM, header at 0xFFC0
         offset = self.get_header_offset()
         header = {}
 
         # Title (21 bytes at offset + 0x10)
         title_offset = offset + 0x10
-        header["title"] = self.rom_data[title_offset:title_offset + 21].decode("ascii", errors="replace").strip()
-
-        # Map mode byte
-        header["map_mode"] = self.rom_data[offset + 0x15]
-        header["rom_type"] = self.rom_data[offset + 0x16]
-        header["rom_size"] = 1 << self.rom_data[offset + 0x17]  # in KB
-        header["sram_size"] = 1 << self.rom_data[offset + 0x18] if self.rom_data[offset + 0x18] else 0
-        header["country"] = self.rom_data[offset + 0x19]
-        header["developer"] = self.rom_data[offset + 0x1A]
-        header["version"] = self.rom_data[offset + 0x1B]
+        header["title"] = self.read_bytes(title_offset, 21).decode("ascii", errors="replace").strip()
+
+        # Map mode through checksum (offset + 0x15 .. 0x1F) in one unpack
+        (map_mode, rom_type, rom_size_log, sram_log, country, developer, version,
+         checksum_complement, checksum) = struct.unpack_from("<BBBBBBBHH", self.rom_data, offset + 0x15)
+        header["map_mode"] = map_mode
+        header["rom_type"] = rom_type
+        header["rom_size"] = 1 << rom_size_log  # in KB
+        header["sram_size"] = 1 << sram_log if sram_log else 0
+        header["country"] = country
+        header["developer"] = developer
+        header["version"] = version
 
         # Checksums
-        header["checksum_complement"] = struct.unpack_from("<H", self.rom_data, offset + 0x1C)[0]
-        header["checksum"] = struct.unpack_from("<H", self.rom_data, offset + 0x1E)[0]
+        header["checksum_complement"] = checksum_complement
+        header["checksum"] = checksum
 
         return header
 
     def compute_checksum(self) -> int:
         """Compute the SNES checksum of the ROM."""
-        return sum(self.rom_data) & 0xFFFF
-
-    def get_hashes(self) -> dict:
-        """Compute MD5 and SHA1 of the ROM data (without copier header)."""
-        return {
-            "md5": hashlib.md5(self.rom_data).hexdigest(),
-            "sha1": hashlib.sha1(self.rom_data).hexdigest(),
-        }
+        return self._checksum
+
+    @cached_property
+    def _checksum(self) -> int:
+        self._madvise("MADV_SEQUENTIAL")
+        try:
+            arr = np.frombuffer(self.rom_data, dtype=np.uint8)
+            return int(arr.sum(dtype=np.uint64)) & 0xFFFF
+        finally:
+            self._madvise("MADV_NORMAL")
+
+    def _digest(self, algo: str) -> str:
+        """Hash the mapped ROM data (without copier header)."""
+        return hashlib.new(algo, self.rom_data).hexdigest()
+
+    def get_hashes(self, algos=("md5",)) -> dict:
+        """Compute the requested hashes of the ROM data (without copier header)."""
+        missing = [algo for algo in algos if algo not in self._hashes]
+        if missing:
+            self._madvise("MADV_SEQUENTIAL")
+        try:
+            if len(missing) > 1:
+                # hashlib releases the GIL on large buffers, so the digests run in parallel
+                with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                    self._hashes.update(zip(missing, pool.map(self._digest, missing)))
+            elif missing:
+                self._hashes[missing[0]] = self._digest(missing[0])
+        finally:
+            if missing:
+                self._madvise("MADV_NORMAL")
+        return {algo: self._hashes[algo] for algo in algos}
 
     def read_bytes(self, offset: int, length: int) -> bytes:
         """Read bytes from ROM at given offset."""
-        return self.rom_data[offset:offset + length]
+        return bytes(self.rom_data[offset:offset + length])
 
     def hexdump(self, offset: int, length: int) -> str:
         """Generate a hex dump of ROM data."""
         data = self.read_bytes(offset, length)
+        # Format both columns for the whole range up front; each row is then
+        # just a slice (3 hex chars per byte, 1 ASCII char per byte)
+        hex_all = data.hex(" ").upper()
+        ascii_all = data.translate(_ASCII_TABLE).decode("ascii")
         lines = []
         for i in range(0, len(data), 16):
-            chunk = data[i:i + 16]
-            hex_part = " ".join(f"{b:02X}" for b in chunk)
-            ascii_part = "".join(chr(b) if 32 <= b < 127 else "." for b in chunk)
+            hex_part = hex_all[i * 3:i * 3 + 47]
+            ascii_part = ascii_all[i:i + 16]
             lines.append(f"  {offset + i:06X}: {hex_part:<48s} {ascii_part}")
         return "\n".join(lines)
 
-    def compare(self, other: "SNESRom") -> list:
-        """Compare two ROMs and return list of differences."""
-        diffs = []
-        max_len = max(len(self.rom_data), len(other.rom_data))
+    def _common_views(self, other: "SNESRom") -> tuple:
+        """Zero-copy uint8 views of both ROMs over their common length."""
         min_len = min(len(self.rom_data), len(other.rom_data))
-
-        for i in range(min_len):
-            if self.rom_data[i] != other.rom_data[i]:
-                diffs.append({
-                    "offset": i,
-                    "original": self.rom_data[i],
-                    "modified": other.rom_data[i],
-                })
-
-        if len(self.rom_data) != len(other.rom_data):
-            diffs.append({
-                "offset": min_len,
-                "note": f"Size difference: {len(self.rom_data)} vs {len(other.rom_data)} bytes",
-            })
-
-        return diffs
+        a = np.frombuffer(self.rom_data, dtype=np.uint8)[:min_len]
+        b = np.frombuffer(other.rom_data, dtype=np.uint8)[:min_len]
+        return a, b
+
+    def iter_diffs(self, other: "SNESRom"):
+        """Yield (offset, original, modified) for each differing byte, in order.
+
+        Scans DIFF_BLOCK_SIZE bytes at a time, so the first differences are
+        available without scanning (or holding indices for) the whole ROM.
+        A size mismatch is not reported; compare `size` for that.
+        """
+        a, b = self._common_views(other)
+        for start in range(0, a.size, DIFF_BLOCK_SIZE):
+            a_blk = a[start:start + DIFF_BLOCK_SIZE]
+            b_blk = b[start:start + DIFF_BLOCK_SIZE]
+            idx = np.flatnonzero(a_blk != b_blk)
+            if idx.size:
+                yield from zip((idx + start).tolist(), a_blk[idx].tolist(), b_blk[idx].tolist())
+
+    def count_diffs(self, other: "SNESRom") -> int:
+        """Count differing bytes over the common length."""
+        a, b = self._common_views(other)
+        return int(np.count_nonzero(a != b))
+
+    def compare(self, other: "SNESRom", limit: int = 100) -> tuple:
+        """Compare two ROMs byte-by-byte over their common length.
+
+        Returns (diffs, total): a DIFF_DTYPE array of at most `limit`
+        differences, and the total number of differing bytes.
+        """
+        diffs = np.fromiter(itertools.islice(self.iter_diffs(other), limit), dtype=DIFF_DTYPE)
+        return diffs, self.count_diffs(other)
 
 
 # =============================================================================
 # CLI Commands
 # =============================================================================
+def _write_json(result: dict):
+    """Emit a command result as one JSON document in a single write."""
+    sys.stdout.write(json.dumps(result) + "\n")
+
+
 def cmd_info(args):
     """Display comprehensive ROM information."""
     rom = SNESRom(args.rom)
     header = rom.read_internal_header()
-    hashes = rom.get_hashes()
+    algos = ("md5",) + (("sha1",) if args.sha1 else ())
+    hashes = {} if args.no_hashes else rom.get_hashes(algos)
+
+    if args.json:
+        result = {
+            "file": rom.filepath.name,
+            "file_size": len(rom.data),
+            "has_header": rom.has_header,
+            "size": rom.size,
+            "mapping_mode": rom.mapping_mode,
+        }
+        _write_json(result | header | hashes)
+        return
 
     print(f"ROM File: {rom.filepath.name}")
     print(f"File Size: {len(rom.data):,} bytes ({len(rom.data) / 1024:.0f} KB)")
@@ -187,10 +323,13 @@ def cmd_info(args):
     print(f"Checksum: 0x{header['checksum']:04X}")
     print(f"Complement: 0x{header['checksum_complement']:04X}")
     print(f"Valid: {(header['checksum'] ^ header['checksum_complement']) == 0xFFFF}")
+    if not hashes:
+        return
     print()
     print("--- Hashes ---")
     print(f"MD5:  {hashes['md5']}")
-    print(f"SHA1: {hashes['sha1']}")
+    if "sha1" in hashes:
+        print(f"SHA1: {hashes['sha1']}")
 
 
 def cmd_hexdump(args):
@@ -205,28 +344,48 @@ def cmd_compare(args):
     """Compare two ROMs."""
     rom1 = SNESRom(args.rom)
     rom2 = SNESRom(args.rom2)
-    diffs = rom1.compare(rom2)
+    # Kick off readahead on both before scanning either so the reads overlap
+    rom1.prefetch()
+    rom2.prefetch()
+    size_differs = rom1.size != rom2.size
+
+    # In both output modes the total counts differing bytes over the common
+    # length only; a size mismatch is reported separately
+    if args.json:
+        diffs, total = rom1.compare(rom2)
+        _write_json({
+            "total": total,
+            "size_differs": size_differs,
+            "sizes": [rom1.size, rom2.size],
+            "diffs": [dict(zip(DIFF_DTYPE.names, row)) for row in diffs.tolist()],
+        })
+        return
+
+    # Print rows as the scan finds them; the total is only known afterwards,
+    # and needs a full counting pass only if the listing was cut off
+    limit = 100
+    shown = 0
+    for offset, original, modified in itertools.islice(rom1.iter_diffs(rom2), limit):
+        print(f"  0x{offset:06X}: {original:02X} -> {modified:02X}")
+        shown += 1
+    total = rom1.count_diffs(rom2) if shown == limit else shown
 
-    if not diffs:
+    if not total and not size_differs:
         print("ROMs are identical.")
         return
 
-    print(f"Found {len(diffs)} difference(s):")
-    for d in diffs[:100]:  # Limit output
-        if "note" in d:
-            print(f"  {d['note']}")
-        else:
-            print(f"  0x{d['offset']:06X}: {d['original']:02X} -> {d['modified']:02X}")
-
-    if len(diffs) > 100:
-        print(f"  ... and {len(diffs) - 100} more differences")
+    if total > shown:
+        print(f"  ... and {total - shown} more differences")
+    print(f"Found {total} differing byte(s).")
+    if size_differs:
+        print(f"Size difference: {rom1.size} vs {rom2.size} bytes")
 
 
 def cmd_offsets(args):
     """Print known CT data offsets."""
     print("Known Chrono Trigger Data Offsets (PC addresses, unheadered):")
     print()
-    for name, offset in sorted(CT_DATA_OFFSETS.items()):
+    for name, offset in _CT_OFFSETS_SORTED:
         print(f"  {name:<25s} 0x{offset:06X}")
 
 
@@ -237,6 +396,9 @@ def main():
     # info
     p_info = subparsers.add_parser("info", help="Display ROM information")
     p_info.add_argument("rom", help="Path to ROM file")
+    p_info.add_argument("--json", action="store_true", help="Output as JSON")
+    p_info.add_argument("--no-hashes", action="store_true", help="Skip computing hashes")
+    p_info.add_argument("--sha1", action="store_true", help="Also compute SHA1")
 
     # hexdump
     p_hex = subparsers.add_parser("hexdump", help="Hex dump ROM section")
@@ -248,6 +410,7 @@ def main():
     p_cmp = subparsers.add_parser("compare", help="Compare two ROMs")
     p_cmp.add_argument("rom", help="Original ROM")
     p_cmp.add_argument("rom2", help="Modified ROM")
+    p_cmp.add_argument("--json", action="store_true", help="Output as JSON")
 
     # offsets
     subparsers.add_parser("offsets", help="Print known CT data offsets")